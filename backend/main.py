@@ -6,62 +6,173 @@ Provides endpoints for running energy simulations with configurable parameters.
 """
 
 import os
-import json
+import re
+import queue
 import pickle
+import hashlib
+import logging
+import logging.handlers
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from functools import lru_cache
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
+import orjson
+import msgspec
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Optional, List
 import numpy as np
 from dotenv import load_dotenv
 
-from simulation import MicrogridSimulator, SimulationConfig
+from dataclasses import replace
+
+from simulation import MicrogridSimulator, SimulationConfig, warmup_kernel
+
+# Shared default config; per-request configs are derived from it via
+# dataclasses.replace with only the fields the client actually sent
+_DEFAULT_CONFIG = SimulationConfig()
+
+# Single long-lived simulator, reconfigured per request instead of
+# reallocated. Guarded by a lock since requests run in the threadpool.
+_SIMULATOR = MicrogridSimulator()
+_SIMULATOR_LOCK = threading.Lock()
+
+
+def _run_simulation_for(config: SimulationConfig) -> dict:
+    """Run one simulation on the shared simulator instance."""
+    with _SIMULATOR_LOCK:
+        _SIMULATOR.configure(config)
+        return _SIMULATOR.run_comparison()
 
 # Load environment variables
 load_dotenv()
 
-# Try to import Groq
+# Queue-based logging: handlers run on a listener thread so stream I/O
+# (and its flushes) stay off the request path
+_log_queue = queue.SimpleQueue()
+logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+
+logger = logging.getLogger(__name__)
+
+# Try to import Groq (async client so LLM calls don't block the event loop)
 try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
+    import httpx
+    from groq import AsyncGroq
     groq_api_key = os.getenv("GROQ_API_KEY")
-    if groq_api_key and groq_api_key != "your_groq_api_key_here":
-        groq_client = Groq(api_key=groq_api_key)
-    else:
-        GROQ_AVAILABLE = False
-        groq_client = None
+    GROQ_AVAILABLE = bool(groq_api_key and groq_api_key != "your_groq_api_key_here")
 except ImportError:
     GROQ_AVAILABLE = False
-    groq_client = None
+
+# Bound during lifespan startup so one pooled client serves all requests
+groq_client = None
+
+# Try to connect Redis for caching deterministic /simulate results
+try:
+    import redis.asyncio as redis
+    redis_client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis_client = None
+
+# Cached simulation results expire after an hour
+SIM_CACHE_TTL = 3600
+
+# In-process LRU of serialized simulation results - the cheapest cache
+# tier, checked before Redis. Keyed on the SimulationConfig field tuple.
+_SIM_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_SIM_CACHE_MAX = 256
+
+
+def _sim_cache_get(key: tuple) -> Optional[bytes]:
+    blob = _SIM_CACHE.get(key)
+    if blob is not None:
+        _SIM_CACHE.move_to_end(key)
+    return blob
+
+
+def _sim_cache_put(key: tuple, blob: bytes) -> None:
+    _SIM_CACHE[key] = blob
+    _SIM_CACHE.move_to_end(key)
+    while len(_SIM_CACHE) > _SIM_CACHE_MAX:
+        _SIM_CACHE.popitem(last=False)
+
+
+def _simulation_cache_key(request: "SimulationRequest") -> str:
+    """Stable cache key from the normalized request parameters."""
+    payload = orjson.dumps(request.model_dump(), option=orjson.OPT_SORT_KEYS)
+    return "sim:" + hashlib.blake2b(payload).hexdigest()
 
 
 # ============================================
 # FastAPI Application Setup
 # ============================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown for shared resources."""
+    # Raise the anyio threadpool limit so concurrent CPU-bound
+    # simulation requests aren't queued behind the default 40 tokens
+    from anyio import to_thread
+    to_thread.current_default_thread_limiter().total_tokens = 64
+
+    # Compile the Numba dispatch kernel before serving traffic so the
+    # first /simulate request doesn't pay the JIT cold-start cost
+    await run_in_threadpool(warmup_kernel)
+
+    # One pooled Groq client for the process lifetime: keep-alive and
+    # HTTP/2 connection reuse avoid a TLS handshake per LLM call
+    global groq_client
+    if GROQ_AVAILABLE:
+        groq_client = AsyncGroq(
+            api_key=groq_api_key,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=32)
+            )
+        )
+
+    yield
+
+    if groq_client is not None:
+        await groq_client.close()
+
+    # Flush queued log records before the listener thread goes away
+    _log_listener.stop()
+
+
 app = FastAPI(
     title="Microgrid Digital Twin API",
     description="Simulate 24-hour microgrid energy cycles with Solar, Battery, and Grid integration",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS Configuration - Allow frontend to connect
+# The hosted frontend calls this API cross-origin, so default to "*"
+# (override with a comma-separated CORS_ALLOW_ORIGINS to lock down);
+# the compiled regex additionally covers all localhost dev ports
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",      # Next.js dev server
-        "http://127.0.0.1:3000",
-        "http://localhost:3001", 
-        "*",
-    ],
-    allow_credentials=True,
+    allow_origins=os.getenv("CORS_ALLOW_ORIGINS", "*").split(","),
+    allow_origin_regex=r"^https?://(localhost|127\.0\.0\.1)(:\d{2,5})?$",
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress the large, highly repetitive /simulate JSON payloads; small
+# responses (hints, health check) pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 
 
@@ -212,38 +323,56 @@ async def root():
 async def run_simulation(request: SimulationRequest = None):
     """
     Run a 24-hour microgrid simulation.
-    
+
     Compares Baseline strategy (no battery usage) vs Smart strategy
     (intelligent battery dispatch with peak shaving).
-    
+
     Returns hourly data for both strategies plus summary metrics
     including cost savings and grid usage reduction.
+
+    Results are deterministic in the config, so repeat parameter sets
+    are served from Redis when available.
     """
     try:
         # Use defaults if no request body provided
         if request is None:
             request = SimulationRequest()
-        
-        # Create configuration from request
-        config = SimulationConfig(
-            battery_capacity_kwh=request.battery_capacity_kwh,
-            solar_capacity_kw=request.solar_capacity_kw,
-            weather_mode=request.weather_mode,
-            peak_load_demand=request.peak_load_demand,
-            off_peak_price=request.off_peak_price,
-            standard_price=request.standard_price,
-            peak_price=request.peak_price,
-            initial_soc=request.initial_soc,
-            tariff_mode=request.tariff_mode,
-            derc_season=request.derc_season,
-            derc_discom=request.derc_discom
-        )
-        
-        # Run simulation
-        simulator = MicrogridSimulator(config)
-        results = simulator.run_comparison()
-        
-        return results
+
+        # Create configuration from request - only the fields the client
+        # sent are overridden, everything else reuses the shared default
+        # (Pydantic already validated them on ingress)
+        config = replace(_DEFAULT_CONFIG, **request.model_dump(exclude_unset=True))
+
+        # Tier 1: in-process LRU - no serialization round-trip at all
+        local_key = config._key()
+        blob = _sim_cache_get(local_key)
+        if blob is not None:
+            return Response(content=blob, media_type="application/json")
+
+        # Tier 2: Redis - shared across workers
+        cache_key = _simulation_cache_key(request)
+        if REDIS_AVAILABLE:
+            try:
+                cached = await redis_client.get(cache_key)
+                if cached is not None:
+                    _sim_cache_put(local_key, cached)
+                    return Response(content=cached, media_type="application/json")
+            except Exception:
+                pass  # Redis down - fall through and recompute
+
+        # Run the CPU-bound simulation in the threadpool, keeping the loop free
+        results = await run_in_threadpool(_run_simulation_for, config)
+
+        # OPT_SERIALIZE_NUMPY: the hourly records hold np.float64 values
+        blob = orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY)
+        _sim_cache_put(local_key, blob)
+        if REDIS_AVAILABLE:
+            try:
+                await redis_client.setex(cache_key, SIM_CACHE_TTL, blob)
+            except Exception:
+                pass
+
+        return Response(content=blob, media_type="application/json")
     
     except Exception as e:
         raise HTTPException(
@@ -256,19 +385,94 @@ async def run_simulation(request: SimulationRequest = None):
 async def run_default_simulation():
     """
     Run simulation with default parameters.
-    
+
     Convenience endpoint for quick testing without request body.
     Uses: 10 kWh battery, $0.25 peak, $0.10 off-peak pricing.
     """
-    simulator = MicrogridSimulator()
-    return simulator.run_comparison()
+    try:
+        local_key = _DEFAULT_CONFIG._key()
+        blob = _sim_cache_get(local_key)
+        if blob is not None:
+            return Response(content=blob, media_type="application/json")
+
+        cache_key = "sim:default"
+        if REDIS_AVAILABLE:
+            try:
+                cached = await redis_client.get(cache_key)
+                if cached is not None:
+                    _sim_cache_put(local_key, cached)
+                    return Response(content=cached, media_type="application/json")
+            except Exception:
+                pass
+
+        results = await run_in_threadpool(_run_simulation_for, _DEFAULT_CONFIG)
+
+        blob = orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY)
+        _sim_cache_put(local_key, blob)
+        if REDIS_AVAILABLE:
+            try:
+                await redis_client.setex(cache_key, SIM_CACHE_TTL, blob)
+            except Exception:
+                pass
+
+        return Response(content=blob, media_type="application/json")
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Simulation error: {str(e)}"
+        )
+
+
+@app.post("/simulate/batch")
+async def run_simulation_batch(requests: List[SimulationRequest]):
+    """
+    Run several simulations in one call.
+
+    Amortizes HTTP, validation and serialization overhead across a
+    parameter sweep. Each entry hits the same in-process cache as
+    /simulate; the misses are computed together in one threadpool hop.
+    """
+    try:
+        configs = [
+            replace(_DEFAULT_CONFIG, **r.model_dump(exclude_unset=True))
+            for r in requests
+        ]
+
+        results: List[Optional[dict]] = [None] * len(configs)
+        misses = []
+        for i, config in enumerate(configs):
+            blob = _sim_cache_get(config._key())
+            if blob is not None:
+                results[i] = orjson.loads(blob)
+            else:
+                misses.append(i)
+
+        if misses:
+            def _run_misses():
+                return [_run_simulation_for(configs[i]) for i in misses]
+
+            for i, res in zip(misses, await run_in_threadpool(_run_misses)):
+                results[i] = res
+                _sim_cache_put(
+                    configs[i]._key(),
+                    orjson.dumps(res, option=orjson.OPT_SERIALIZE_NUMPY)
+                )
+
+        return ORJSONResponse(results)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Simulation error: {str(e)}"
+        )
 
 
 @app.get("/config/defaults")
 async def get_default_config():
     """Get default simulation configuration values."""
-    config = SimulationConfig()
-    return {
+    config = _DEFAULT_CONFIG
+    return ORJSONResponse({
         "battery_capacity_kwh": config.battery_capacity_kwh,
         "battery_efficiency": config.battery_efficiency,
         "min_soc": config.min_soc,
@@ -277,7 +481,7 @@ async def get_default_config():
         "peak_price": config.peak_price,
         "off_peak_price": config.off_peak_price,
         "peak_hours": config.peak_hours
-    }
+    })
 
 
 @app.get("/bms/metadata", response_model=BmsMetadataResponse)
@@ -338,25 +542,26 @@ async def predict_bms(request: BmsPredictRequest):
 # ============================================
 # AI Hint Engine Models & Endpoint
 # ============================================
-class SimulationHistoryItem(BaseModel):
-    """A single simulation run's key metrics."""
-    eco_score: float = Field(description="Eco-score (0-100) for this simulation")
-    cost_saved_percent: float = Field(description="Percentage of cost saved vs baseline")
-    grid_reduced_percent: float = Field(description="Percentage of grid usage reduced")
-    battery_utilization: float = Field(description="How well the battery was used (0-100)")
-    solar_utilization: float = Field(description="How well solar was used (0-100)")
-    battery_empty_during_peak: bool = Field(description="Whether battery was empty during peak hours")
-    battery_full_during_solar: bool = Field(description="Whether battery was full when solar was generating")
-    charging_during_peak: bool = Field(description="Whether grid charging happened during peak hours")
-
-class HintRequest(BaseModel):
+class SimulationHistoryItem(msgspec.Struct):
+    """A single simulation run's key metrics.
+
+    Decoded with msgspec instead of Pydantic: hint payloads carry up to
+    three of these 8-field items per call, and msgspec's C decoder is an
+    order of magnitude faster than model validation.
+    """
+    eco_score: float            # Eco-score (0-100) for this simulation
+    cost_saved_percent: float   # Percentage of cost saved vs baseline
+    grid_reduced_percent: float  # Percentage of grid usage reduced
+    battery_utilization: float  # How well the battery was used (0-100)
+    solar_utilization: float    # How well solar was used (0-100)
+    battery_empty_during_peak: bool   # Battery empty during peak hours
+    battery_full_during_solar: bool   # Battery full while solar generating
+    charging_during_peak: bool        # Grid charging during peak hours
+
+class HintRequest(msgspec.Struct):
     """Request model for AI hints based on simulation history."""
-    simulation_history: List[SimulationHistoryItem] = Field(
-        description="List of recent simulation results (last 3)"
-    )
-    current_config: dict = Field(
-        description="Current simulation configuration parameters"
-    )
+    simulation_history: List[SimulationHistoryItem]  # Recent results (last 3)
+    current_config: dict        # Current simulation configuration parameters
 
 class HintResponse(BaseModel):
     """Response model for AI-generated hints."""
@@ -367,6 +572,56 @@ class HintResponse(BaseModel):
     confidence: float
 
 
+# ============================================
+# Semantic Hint Cache
+# ============================================
+# Nearly identical simulation metrics produce nearly identical hints,
+# so cache Groq responses keyed by a small normalized feature vector
+# and serve near-matches (L2 distance below threshold) without an LLM call.
+# Extracts the JSON object from LLM output in a single pass, tolerating
+# surrounding prose or markdown code fences
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+_HINT_CACHE_MAX = 1024
+_HINT_CACHE_THRESHOLD = 0.15
+_hint_vectors = np.empty((0, 8))
+_hint_responses: List[HintResponse] = []
+
+
+def _hint_feature_vector(item: SimulationHistoryItem) -> np.ndarray:
+    """Build the normalized metrics vector used for cache lookups."""
+    return np.array([
+        item.eco_score / 100.0,
+        item.cost_saved_percent / 100.0,
+        item.grid_reduced_percent / 100.0,
+        item.solar_utilization / 100.0,
+        item.battery_utilization / 100.0,
+        float(item.battery_empty_during_peak),
+        float(item.battery_full_during_solar),
+        float(item.charging_during_peak),
+    ])
+
+
+def _hint_cache_lookup(vector: np.ndarray) -> Optional[HintResponse]:
+    if not _hint_responses:
+        return None
+    distances = np.linalg.norm(_hint_vectors - vector, axis=1)
+    nearest = int(distances.argmin())
+    if distances[nearest] < _HINT_CACHE_THRESHOLD:
+        return _hint_responses[nearest]
+    return None
+
+
+def _hint_cache_store(vector: np.ndarray, response: HintResponse) -> None:
+    global _hint_vectors
+    _hint_vectors = np.vstack([_hint_vectors, vector])
+    _hint_responses.append(response)
+    if len(_hint_responses) > _HINT_CACHE_MAX:
+        # FIFO eviction
+        _hint_vectors = _hint_vectors[1:]
+        _hint_responses.pop(0)
+
+
 def generate_fallback_hint(history: List[SimulationHistoryItem], config: dict) -> HintResponse:
     """Generate rule-based hints when Gemini is not available."""
     latest = history[-1] if history else None
@@ -435,8 +690,12 @@ def generate_fallback_hint(history: List[SimulationHistoryItem], config: dict) -
     )
 
 
-async def generate_groq_hint(history: List[SimulationHistoryItem], config: dict) -> HintResponse:
-    """Generate AI-powered hints using Groq - analyzes simulation intelligently."""
+async def generate_groq_hint(history: List[SimulationHistoryItem], config: dict) -> Optional[HintResponse]:
+    """Generate AI-powered hints using Groq - analyzes simulation intelligently.
+
+    Returns None if the Groq call fails, so the caller can fall back to
+    rule-based hints without caching the degraded response.
+    """
     try:
         latest = history[-1] if history else None
         
@@ -494,7 +753,7 @@ Respond ONLY with this JSON (no other text):
     "confidence": 0.0 to 1.0
 }}"""
 
-        chat_completion = groq_client.chat.completions.create(
+        chat_completion = await groq_client.chat.completions.create(
             messages=[
                 {
                     "role": "system",
@@ -510,16 +769,15 @@ Respond ONLY with this JSON (no other text):
             max_tokens=400,
         )
         
-        response_text = chat_completion.choices[0].message.content.strip()
-        
-        # Clean up the response (remove markdown code blocks if present)
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        response_text = response_text.strip()
-        
-        hint_data = json.loads(response_text)
+        response_text = chat_completion.choices[0].message.content
+
+        # Pull the JSON object out of the response in one pass (handles
+        # markdown code fences and stray prose around it)
+        match = _JSON_RE.search(response_text)
+        if match is None:
+            raise ValueError(f"No JSON object in Groq response: {response_text!r}")
+
+        hint_data = orjson.loads(match.group(0))
         
         return HintResponse(
             should_show_hint=True,
@@ -529,21 +787,28 @@ Respond ONLY with this JSON (no other text):
             confidence=float(hint_data.get("confidence", 0.8))
         )
         
-    except Exception as e:
-        print(f"Groq API error: {e}")
-        # Fall back to rule-based hints
-        return generate_fallback_hint(history, config)
+    except Exception:
+        logger.exception("Groq API error")
+        return None
 
 
 @app.post("/hints", response_model=HintResponse)
-async def get_ai_hint(request: HintRequest):
+async def get_ai_hint(raw_request: Request):
     """
     Get AI-powered hints based on simulation performance.
-    
+
     Analyzes the student's simulation results and provides
     personalized, contextual hints to improve their understanding
     of microgrid energy management. Works immediately after first simulation.
+
+    The body is decoded with msgspec directly into HintRequest,
+    skipping Pydantic's per-field validation overhead.
     """
+    try:
+        request = msgspec.json.decode(await raw_request.body(), type=HintRequest)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     history = request.simulation_history
     config = request.current_config
     
@@ -559,9 +824,22 @@ async def get_ai_hint(request: HintRequest):
     
     # Generate hint using Groq if available, otherwise use fallback
     if GROQ_AVAILABLE:
-        return await generate_groq_hint(history, config)
-    else:
-        return generate_fallback_hint(history, config)
+        # Serve near-identical metrics from the semantic cache
+        vector = _hint_feature_vector(history[-1])
+        cached = _hint_cache_lookup(vector)
+        if cached is not None:
+            return cached
+
+        hint = await generate_groq_hint(history, config)
+        if hint is not None:
+            # Only cache hints that actually came from Groq - a cached
+            # fallback would keep serving stale advice after recovery
+            _hint_cache_store(vector, hint)
+            return hint
+
+    # Run the rule-based generator in the threadpool so hint bursts
+    # don't block the event loop while Groq is unavailable or failing
+    return await run_in_threadpool(generate_fallback_hint, history, config)
 
 
 # ============================================
@@ -580,45 +858,17 @@ class ChatResponse(BaseModel):
     suggestion_type: Optional[str] = "general"
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat_with_assistant(request: ChatRequest):
-    """
-    Chat with the AI Lab Assistant about microgrids.
-    Maintains conversation context and provides educational responses.
-    """
-    if not GROQ_AVAILABLE:
-        return ChatResponse(
-            response="I'm sorry, the AI assistant is currently unavailable. Please check back later or refer to the theory section for help.",
-            suggestion_type="general"
-        )
-    
-    try:
-        # Build context from simulation data if available
-        context_text = ""
-        if request.simulation_context:
-            ctx = request.simulation_context
-            context_text = f"""
-Current Simulation Setup:
-- Battery: {ctx.get('battery_capacity', 10)} kWh at {ctx.get('initial_soc', 50)}% charge
-- Solar: {ctx.get('solar_capacity', 5)} kW capacity
-- Max Load: {ctx.get('peak_load_demand', 7)} kW
-- Weather: {ctx.get('weather_mode', 'sunny')}
-- Latest Eco-Score: {ctx.get('eco_score', 'Not run yet')}
-"""
-
-        # Format conversation history
-        formatted_messages = [
-            {
-                "role": "system",
-                "content": f"""You are a friendly and knowledgeable AI Lab Assistant for a microgrid energy simulation lab. Your role is to help students understand:
+# System prompt built once at module load and kept byte-identical across
+# requests so Groq can reuse its KV cache for the shared prefix. The
+# per-request simulation context travels as a separate message instead
+# of being interpolated here, which would invalidate the prefix.
+_CHAT_SYSTEM_PROMPT = """You are a friendly and knowledgeable AI Lab Assistant for a microgrid energy simulation lab. Your role is to help students understand:
 
 1. **Microgrid Concepts**: Solar panels, batteries, grid integration, energy flow
 2. **Time-of-Use Pricing**: Peak hours (6PM-10PM cost more), off-peak hours (midnight-6AM cost less)
 3. **Smart Energy Strategies**: Peak shaving, load shifting, battery scheduling
 4. **Optimization Tips**: How to maximize solar utilization, minimize grid costs
 
-{context_text}
-
 Guidelines:
 - Be concise but educational (2-4 sentences typically)
 - Use simple analogies when explaining complex concepts
@@ -626,17 +876,83 @@ Guidelines:
 - Suggest specific parameter changes when asked for optimization advice
 - Use emojis sparingly to be friendly 🔋☀️⚡
 - If asked about something outside microgrids, politely redirect to the topic"""
-            }
-        ]
-        
-        # Add conversation history
-        for msg in request.messages[-10:]:  # Keep last 10 messages for context
-            formatted_messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        chat_completion = groq_client.chat.completions.create(
+
+
+def _build_chat_messages(request: ChatRequest) -> List[dict]:
+    """Assemble the Groq message list for a chat request."""
+    # Stable system prompt first - keeps the long prefix cacheable
+    formatted_messages = [
+        {
+            "role": "system",
+            "content": _CHAT_SYSTEM_PROMPT
+        }
+    ]
+
+    # Add conversation history next - system prompt plus accumulated
+    # history form a stable, growing prefix for KV-cache reuse
+    history = request.messages[-10:]  # Keep last 10 messages for context
+    for msg in history[:-1]:
+        formatted_messages.append({
+            "role": msg.role,
+            "content": msg.content
+        })
+
+    # Per-request simulation context goes just before the newest user
+    # message, so a context change only invalidates this short suffix
+    if request.simulation_context:
+        ctx = request.simulation_context
+        formatted_messages.append({
+            "role": "user",
+            "content": f"""For reference, my current simulation setup is:
+- Battery: {ctx.get('battery_capacity', 10)} kWh at {ctx.get('initial_soc', 50)}% charge
+- Solar: {ctx.get('solar_capacity', 5)} kW capacity
+- Max Load: {ctx.get('peak_load_demand', 7)} kW
+- Weather: {ctx.get('weather_mode', 'sunny')}
+- Latest Eco-Score: {ctx.get('eco_score', 'Not run yet')}"""
+        })
+
+    if history:
+        formatted_messages.append({
+            "role": history[-1].role,
+            "content": history[-1].content
+        })
+
+    return formatted_messages
+
+
+# One compiled alternation instead of a lower() copy plus six substring
+# scans; the matched group says which category the keyword belongs to
+_SUGG_RE = re.compile(
+    r"(battery|charge|soc)|(solar|panel|sun)|(price|cost|peak)",
+    re.IGNORECASE
+)
+_SUGG_TYPES = ("battery", "solar", "pricing")
+
+
+def _classify_suggestion(response_text: str) -> str:
+    """Determine suggestion type based on response content."""
+    match = _SUGG_RE.search(response_text)
+    if match is None:
+        return "general"
+    return _SUGG_TYPES[match.lastindex - 1]
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_with_assistant(request: ChatRequest):
+    """
+    Chat with the AI Lab Assistant about microgrids.
+    Maintains conversation context and provides educational responses.
+    """
+    if not GROQ_AVAILABLE:
+        return ChatResponse(
+            response="I'm sorry, the AI assistant is currently unavailable. Please check back later or refer to the theory section for help.",
+            suggestion_type="general"
+        )
+
+    try:
+        formatted_messages = _build_chat_messages(request)
+
+        chat_completion = await groq_client.chat.completions.create(
             messages=formatted_messages,
             model="llama-3.3-70b-versatile",
             temperature=0.7,
@@ -644,33 +960,84 @@ Guidelines:
         )
         
         response_text = chat_completion.choices[0].message.content.strip()
-        
-        # Determine suggestion type based on content
-        suggestion_type = "general"
-        lower_response = response_text.lower()
-        if "battery" in lower_response or "charge" in lower_response or "soc" in lower_response:
-            suggestion_type = "battery"
-        elif "solar" in lower_response or "panel" in lower_response or "sun" in lower_response:
-            suggestion_type = "solar"
-        elif "price" in lower_response or "cost" in lower_response or "peak" in lower_response:
-            suggestion_type = "pricing"
-        
+
         return ChatResponse(
             response=response_text,
-            suggestion_type=suggestion_type
+            suggestion_type=_classify_suggestion(response_text)
         )
-        
-    except Exception as e:
-        print(f"Chat API error: {e}")
+
+    except Exception:
+        logger.exception("Chat API error")
         return ChatResponse(
             response="I encountered an issue processing your question. Could you try rephrasing it?",
             suggestion_type="general"
         )
 
 
+@app.post("/chat/stream")
+async def chat_with_assistant_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat using Server-Sent Events.
+
+    Forwards tokens to the client as they arrive from Groq, so the
+    first words appear at time-to-first-token instead of after the
+    full completion. Emits {"delta": ...} events followed by a final
+    {"done": true, "suggestion_type": ...} event.
+    """
+    if not GROQ_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="The AI assistant is currently unavailable"
+        )
+
+    formatted_messages = _build_chat_messages(request)
+
+    async def event_stream():
+        parts = []
+        try:
+            stream = await groq_client.chat.completions.create(
+                messages=formatted_messages,
+                model="llama-3.3-70b-versatile",
+                temperature=0.7,
+                max_tokens=500,
+                stream=True,
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content or ""
+                if delta:
+                    parts.append(delta)
+                    yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+        except Exception:
+            logger.exception("Chat stream error")
+            yield b"data: " + orjson.dumps({"error": "stream interrupted"}) + b"\n\n"
+            return
+
+        yield b"data: " + orjson.dumps({
+            "done": True,
+            "suggestion_type": _classify_suggestion("".join(parts))
+        }) + b"\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 # ============================================
 # Run with Uvicorn
 # ============================================
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+
+    if os.getenv("DEBUG"):
+        # Dev mode: auto-reload, single worker
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        # Production: uvloop event loop + httptools HTTP parser (both C),
+        # multiple workers to use all CPU cores
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop",
+            http="httptools",
+            workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+            reload=False
+        )
@@ -16,10 +16,158 @@ Strategies:
 2. Smart: Intelligent battery dispatch with peak shaving and solar surplus storage
 """
 
+import os
+from pathlib import Path
+
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
 from typing import List, Dict, Any
 
+# Persist compiled kernels next to the module so restarts load from the
+# on-disk cache instead of recompiling (must be set before importing numba)
+os.environ.setdefault(
+    "NUMBA_CACHE_DIR",
+    str(Path(__file__).resolve().parent / ".numba_cache")
+)
+
+# Try to import Numba - the dispatch kernel runs as plain Python if absent
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba isn't installed."""
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True, fastmath=True)
+def _smart_dispatch_kernel(solar, load, price, is_peak,
+                           capacity, efficiency, min_soc, max_soc, initial_soc):
+    """
+    JIT-compiled core of the smart dispatch strategy.
+
+    Pure numeric loop over the 24 hourly energy flows: charge the battery
+    from solar excess, discharge during peak hours, buy the rest from the
+    grid. Takes flat NumPy arrays plus scalar battery parameters and
+    returns per-hour arrays, so Numba can compile it to machine code
+    (cache=True persists the compilation across restarts).
+    """
+    n = solar.shape[0]
+    solar_used_out = np.empty(n)
+    charge_out = np.empty(n)
+    discharge_out = np.empty(n)
+    grid_out = np.empty(n)
+    soc_out = np.empty(n)
+    cost_out = np.empty(n)
+
+    soc = initial_soc
+    for hour in range(n):
+        solar_used = min(solar[hour], load[hour])
+        remaining_load = load[hour] - solar_used
+        solar_excess = max(0.0, solar[hour] - load[hour])
+        battery_charge = 0.0
+        battery_discharge = 0.0
+        grid_usage = 0.0
+
+        # Store solar excess (respecting max SoC and efficiency)
+        if solar_excess > 0.0 and soc < max_soc:
+            available_capacity = (max_soc - soc) * capacity
+            battery_charge = min(solar_excess * efficiency, available_capacity)
+            soc = min(soc + battery_charge / capacity, max_soc)
+
+        # Meet remaining load: battery first during peak, then grid
+        if remaining_load > 0.0:
+            if is_peak[hour] and soc > min_soc:
+                available_energy = (soc - min_soc) * capacity
+                battery_discharge = min(remaining_load, available_energy * efficiency)
+                soc = max(soc - (battery_discharge / efficiency) / capacity, min_soc)
+                remaining_load -= battery_discharge
+            grid_usage = max(0.0, remaining_load)
+
+        solar_used_out[hour] = solar_used
+        charge_out[hour] = battery_charge
+        discharge_out[hour] = battery_discharge
+        grid_out[hour] = grid_usage
+        soc_out[hour] = soc
+        cost_out[hour] = grid_usage * price[hour]
+
+    return solar_used_out, charge_out, discharge_out, grid_out, soc_out, cost_out
+
+
+def warmup_kernel() -> None:
+    """
+    Trigger JIT compilation of the dispatch kernel on dummy inputs.
+
+    The first call to an njit function pays the compile (or cache-load)
+    cost; invoking it here at startup keeps that off the first request.
+    """
+    _smart_dispatch_kernel(
+        np.zeros(24), np.zeros(24), np.ones(24),
+        np.zeros(24, dtype=np.bool_),
+        10.0, 0.95, 0.2, 1.0, 0.5
+    )
+
+
+def _in_range(hour: int, start: int, end: int) -> bool:
+    return (start <= hour < end) if start < end else (hour >= start or hour < end)
+
+
+def _build_derc_slots(season: str, discom: str) -> tuple:
+    """Build the 24-hour tariff-slot schedule for one DERC season/DISCOM."""
+    slots = []
+    for hour in range(24):
+        if season == "summer":
+            if discom == "NDMC":
+                if _in_range(hour, 11, 17):
+                    slots.append("peak")
+                elif _in_range(hour, 2, 8):
+                    slots.append("offpeak")
+                else:
+                    slots.append("normal")
+            elif _in_range(hour, 14, 17) or _in_range(hour, 22, 1):
+                slots.append("peak")
+            elif _in_range(hour, 4, 10):
+                slots.append("offpeak")
+            else:
+                slots.append("normal")
+        elif discom == "BRPL":
+            if _in_range(hour, 9, 14):
+                slots.append("peak")
+            elif _in_range(hour, 0, 7):
+                slots.append("offpeak")
+            else:
+                slots.append("normal")
+        elif discom == "BYPL":
+            if _in_range(hour, 9, 13) or _in_range(hour, 17, 20):
+                slots.append("peak")
+            elif _in_range(hour, 0, 5):
+                slots.append("offpeak")
+            else:
+                slots.append("normal")
+        elif _in_range(hour, 7, 13) or _in_range(hour, 18, 20):
+            slots.append("peak")
+        elif _in_range(hour, 22, 6):
+            slots.append("offpeak")
+        else:
+            slots.append("normal")
+    return tuple(slots)
+
+
+# All 8 DERC season x DISCOM slot schedules, precomputed at import so the
+# simulator indexes into them instead of re-deriving slots per request
+_DERC_SLOTS = {
+    (season, discom): _build_derc_slots(season, discom)
+    for season in ("summer", "winter")
+    for discom in ("TPDDL", "BRPL", "BYPL", "NDMC")
+}
+
 
 @dataclass
 class SimulationConfig:
@@ -44,6 +192,11 @@ class SimulationConfig:
     derc_season: str = "summer"         # "summer" | "winter"
     derc_discom: str = "TPDDL"          # "TPDDL" | "BRPL" | "BYPL" | "NDMC"
 
+    def _key(self) -> tuple:
+        """Hashable identity of this config, used to cache results of
+        the (deterministic) simulation."""
+        return astuple(self)
+
 
 class MicrogridSimulator:
     """
@@ -56,13 +209,24 @@ class MicrogridSimulator:
     
     def __init__(self, config: SimulationConfig = None):
         """Initialize simulator with configuration parameters."""
-        self.config = config or SimulationConfig()
         self.hours = np.arange(24)  # 0-23 hours
-        
+        self.configure(config)
+
+    def configure(self, config: SimulationConfig = None) -> "MicrogridSimulator":
+        """
+        Reconfigure the simulator in place and regenerate the hourly
+        profiles for the new parameters.
+
+        Lets a single long-lived instance be reused across requests
+        instead of constructing (and garbage-collecting) one per call.
+        """
+        self.config = config or SimulationConfig()
+
         # Generate base profiles
         self._generate_solar_profile()
         self._generate_load_profile()
         self._generate_price_profile()
+        return self
     
     def _generate_solar_profile(self) -> None:
         """
@@ -131,46 +295,13 @@ class MicrogridSimulator:
         
         self.price_profile = price
 
-    def _in_range(self, hour: int, start: int, end: int) -> bool:
-        return (start <= hour < end) if start < end else (hour >= start or hour < end)
-
     def _get_derc_slot(self, hour: int) -> str:
-        season = self.config.derc_season
-        discom = self.config.derc_discom
-
-        if season == "summer":
-            if discom == "NDMC":
-                if self._in_range(hour, 11, 17):
-                    return "peak"
-                if self._in_range(hour, 2, 8):
-                    return "offpeak"
-                return "normal"
-
-            if self._in_range(hour, 14, 17) or self._in_range(hour, 22, 1):
-                return "peak"
-            if self._in_range(hour, 4, 10):
-                return "offpeak"
-            return "normal"
-
-        if discom == "BRPL":
-            if self._in_range(hour, 9, 14):
-                return "peak"
-            if self._in_range(hour, 0, 7):
-                return "offpeak"
-            return "normal"
-
-        if discom == "BYPL":
-            if self._in_range(hour, 9, 13) or self._in_range(hour, 17, 20):
-                return "peak"
-            if self._in_range(hour, 0, 5):
-                return "offpeak"
-            return "normal"
-
-        if self._in_range(hour, 7, 13) or self._in_range(hour, 18, 20):
-            return "peak"
-        if self._in_range(hour, 22, 6):
-            return "offpeak"
-        return "normal"
+        # Normalize unknown values the way the old if/else chain fell
+        # through: any season but "summer" uses winter rules, unknown
+        # DISCOMs use the TPDDL schedule
+        season = self.config.derc_season if self.config.derc_season == "summer" else "winter"
+        discom = self.config.derc_discom if self.config.derc_discom in ("BRPL", "BYPL", "NDMC") else "TPDDL"
+        return _DERC_SLOTS[(season, discom)][hour]
 
     def _get_manual_slot(self, hour: int) -> str:
         if 14 <= hour < 22:
@@ -265,86 +396,42 @@ class MicrogridSimulator:
         Returns:
             List of 24 hourly records with energy metrics and costs
         """
+        is_peak = np.array([self._get_tariff_slot(h) == "peak" for h in range(24)])
+
+        # Run the numeric dispatch loop through the compiled kernel
+        solar_used, battery_charge, battery_discharge, grid_usage, soc, cost = \
+            _smart_dispatch_kernel(
+                self.solar_profile,
+                self.load_profile,
+                self.price_profile,
+                is_peak,
+                self.config.battery_capacity_kwh,
+                self.config.battery_efficiency,
+                self.config.min_soc,
+                self.config.max_soc,
+                self.config.initial_soc
+            )
+
         results = []
-        
-        # Battery state tracking
-        soc = self.config.initial_soc  # Current State of Charge (0-1)
-        capacity = self.config.battery_capacity_kwh
-        efficiency = self.config.battery_efficiency
-        min_soc = self.config.min_soc
-        max_soc = self.config.max_soc
-        
         for hour in range(24):
             solar = self.solar_profile[hour]
             load = self.load_profile[hour]
-            price = self.price_profile[hour]
-            is_peak = self._get_tariff_slot(hour) == "peak"
-            
-            # Initialize hourly values
-            solar_used = 0.0
-            grid_usage = 0.0
-            battery_charge = 0.0
-            battery_discharge = 0.0
-            
-            # ========================================
-            # STEP 1: Direct Solar to Load
-            # ========================================
-            solar_used = min(solar, load)
-            remaining_load = load - solar_used
-            solar_excess = max(0, solar - load)
-            
-            # ========================================
-            # STEP 2: Handle Solar Excess (Charge Battery)
-            # ========================================
-            if solar_excess > 0 and soc < max_soc:
-                # Calculate available storage capacity
-                available_capacity = (max_soc - soc) * capacity
-                # Energy that can be stored (accounting for efficiency)
-                energy_to_store = min(solar_excess * efficiency, available_capacity)
-                # Update battery state
-                battery_charge = energy_to_store
-                soc += energy_to_store / capacity
-                soc = min(soc, max_soc)  # Clamp to max
-            
-            # ========================================
-            # STEP 3: Meet Remaining Load
-            # ========================================
-            if remaining_load > 0:
-                # During peak hours: Prioritize battery discharge
-                if is_peak and soc > min_soc:
-                    # Available battery energy
-                    available_energy = (soc - min_soc) * capacity
-                    # Discharge what we can (accounting for efficiency)
-                    battery_discharge = min(remaining_load, available_energy * efficiency)
-                    # Update battery state
-                    actual_discharge = battery_discharge / efficiency
-                    soc -= actual_discharge / capacity
-                    soc = max(soc, min_soc)  # Clamp to min
-                    remaining_load -= battery_discharge
-                
-                # Grid fills any remaining deficit
-                grid_usage = max(0, remaining_load)
-            
-            # ========================================
-            # STEP 4: Calculate Hourly Cost
-            # ========================================
-            cost = grid_usage * price
-            
+
             results.append({
                 "hour": int(hour),
                 "solar_generation": round(solar, 2),
                 "load_demand": round(load, 2),
-                "solar_used": round(solar_used, 2),
-                "solar_excess": round(max(0, solar - load - battery_charge), 2),
-                "grid_usage": round(grid_usage, 2),
-                "battery_charge": round(battery_charge, 2),
-                "battery_discharge": round(battery_discharge, 2),
-                "battery_soc": round(soc * 100, 1),  # Percentage
-                "grid_price": round(price, 3),
-                "hourly_cost": round(cost, 3),
-                "is_peak_hour": bool(is_peak)
+                "solar_used": round(solar_used[hour], 2),
+                "solar_excess": round(max(0, solar - load - battery_charge[hour]), 2),
+                "grid_usage": round(grid_usage[hour], 2),
+                "battery_charge": round(battery_charge[hour], 2),
+                "battery_discharge": round(battery_discharge[hour], 2),
+                "battery_soc": round(soc[hour] * 100, 1),  # Percentage
+                "grid_price": round(self.price_profile[hour], 3),
+                "hourly_cost": round(cost[hour], 3),
+                "is_peak_hour": bool(is_peak[hour])
             })
-        
+
         return results
     
     def run_comparison(self) -> Dict[str, Any]: